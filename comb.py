@@ -1,11 +1,33 @@
 import streamlit as st
 import pandas as pd
 import re
-from typing import Tuple, List
+from typing import Tuple, List, Dict, Any
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.api.types import is_string_dtype
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Limites des caches Streamlit (partagés entre toutes les sessions) : sans elles, chaque fichier
+# chargé, ses résultats et ses exports resteraient en mémoire sur le serveur
+CACHE_MAX_ENTRIES = 8
+CACHE_TTL = 3600  # secondes
+
+# Expressions régulières de nettoyage, compilées une seule fois
+# Noms : espaces multiples -> ' ', caractères de contrôle supprimés (la classe de contrôle
+# exclut les caractères d'espacement : '\t', '\n'... -> ' ')
+_NAME_CLEAN_RE = re.compile(r'(\s+)|[\x00-\x08\x0e-\x1b\x7f-\x84\x86-\x9f]+')
+_CTRL_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+# Correction o->0 : entre deux chiffres, en début ou en fin de référence
+_O_TO_ZERO_RE = re.compile(r'(?<=\d)[oO](?=\d)|^[oO](?=\d)|(?<=\d)[oO]$')
+
+# Équivalents RE2 pour pyarrow.compute (qui attend des motifs sous forme de chaînes)
+# Espaces Unicode, comme le \s de Python
+_ARROW_WS_PATTERN = r'[\t-\r\x1c-\x1f\x85\p{Z}]+'
+_ARROW_CTRL_PATTERN = r'[\x00-\x1f\x7f-\x9f]+'
+
 # Configuration de la page
 st.set_page_config(
     page_title="Nettoyage d'Inventaire",
@@ -14,11 +36,90 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def _name_sub(match: re.Match) -> str:
+    """Remplacement pour _NAME_CLEAN_RE : ' ' pour les espaces, '' pour les caractères de contrôle"""
+    return ' ' if match.group(1) else ''
+
+
+def _to_str_column(values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Convertit une colonne en chaînes.
+    Renvoie la conversion brute (base du comptage des modifications) et la version où
+    NaN et 'nan' deviennent ''. La conversion est évitée si la colonne est déjà textuelle
+    et sans valeur manquante.
+    """
+    missing = values.isna()
+    if missing.any() or not is_string_dtype(values):
+        as_str = values.astype(str)
+        return as_str, as_str.mask(missing | (as_str == 'nan'), '')
+    return values, values.mask(values == 'nan', '')
+
+
+def _clean_ref(ref: str) -> str:
+    """Nettoie une référence : espaces, caractères de contrôle, correction o -> 0"""
+    ref = ref.strip()
+    if not ref.isprintable():
+        ref = _CTRL_RE.sub('', ref)
+    if any(c.isdigit() for c in ref):
+        ref = _O_TO_ZERO_RE.sub('0', ref)
+    return ref
+
+
+def _clean_names(name_values: pd.Series) -> Tuple[pd.Series, int]:
+    """
+    Nettoie une colonne de noms de produits.
+    Renvoie la colonne nettoyée et le nombre de noms modifiés.
+    """
+    if isinstance(name_values.dtype, pd.ArrowDtype) and pa.types.is_string(name_values.dtype.pyarrow_dtype):
+        # Colonne Arrow : noyaux pyarrow.compute (C++, sans le GIL) sur les buffers UTF-8
+        original = pa.array(name_values.array)
+        names = pc.fill_null(pc.if_else(pc.equal(original, 'nan'), '', original), '')
+        # Espaces -> ' ', puis caractères de contrôle supprimés
+        names = pc.replace_substring_regex(names, _ARROW_WS_PATTERN, ' ')
+        names = pc.replace_substring_regex(names, _ARROW_CTRL_PATTERN, '')
+        names = pc.utf8_trim_whitespace(names)
+        
+        names_changed = pc.sum(pc.fill_null(pc.not_equal(original, names), True)).as_py() or 0
+        return pd.Series(pd.arrays.ArrowExtensionArray(names), index=name_values.index), names_changed
+    
+    # Convertir en string une seule fois (réutilisé pour compter les modifications) et gérer les NaN
+    names_as_str, names = _to_str_column(name_values)
+    
+    # Nettoyage des noms en un seul passage de regex.
+    # Raccourci : un nom imprimable ne contient ni caractère de contrôle ni espace autre que ' ',
+    # la regex n'est donc utile que s'il contient des espaces consécutifs
+    cleaned_names = pd.Series([
+        name.strip() if name.isprintable() and '  ' not in name
+        else _NAME_CLEAN_RE.sub(_name_sub, name).strip()
+        for name in names
+    ], index=name_values.index)
+    
+    names_changed = int((names_as_str.to_numpy() != cleaned_names.to_numpy()).sum())
+    return cleaned_names, names_changed
+
+
+def _clean_refs(ref_values: pd.Series) -> Tuple[pd.Series, int]:
+    """
+    Nettoie une colonne de références (espaces, caractères de contrôle, correction o -> 0).
+    Renvoie la colonne nettoyée et le nombre de références modifiées.
+    """
+    # Convertir en string une seule fois et gérer les NaN
+    refs_as_str, refs = _to_str_column(ref_values)
+    
+    # Nettoyage de base et correction intelligente o->0, en un seul passage par référence
+    cleaned_refs = pd.Series([_clean_ref(ref) for ref in refs], index=ref_values.index)
+    
+    refs_changed = int((refs_as_str.to_numpy() != cleaned_refs.to_numpy()).sum())
+    return cleaned_refs, refs_changed
+
+
 def clean_inventory_data(df: pd.DataFrame, 
                         product_name_col: str, 
-                        product_ref_col: str) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+                        product_ref_col: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, Dict[str, Any]]:
     """
     Nettoie les données d'inventaire et divise en combinaisons uniques et dupliquées.
+    Renvoie aussi le nombre d'occurrences de chaque combinaison dupliquée et les
+    statistiques brutes du nettoyage (mises en forme par format_cleaning_warnings).
     """
     # Vérification des colonnes
     if product_name_col not in df.columns:
@@ -26,96 +127,178 @@ def clean_inventory_data(df: pd.DataFrame,
     if product_ref_col not in df.columns:
         raise ValueError(f"Colonne '{product_ref_col}' non trouvée dans le DataFrame")
     
-    # Copie et initialisation
-    cleaned_df = df.copy()
-    warnings = []
-    
-    # === NETTOYAGE DES NOMS DE PRODUITS ===
-    original_names = cleaned_df[product_name_col].copy()
+    # Copie superficielle : seules les deux colonnes clés sont modifiées, et elles sont
+    # remplacées en entier (jamais modifiées sur place), donc df reste intact
+    cleaned_df = df.copy(deep=False)
     
-    # Convertir en string et gérer les NaN
-    cleaned_df[product_name_col] = cleaned_df[product_name_col].astype(str)
-    cleaned_df[product_name_col] = cleaned_df[product_name_col].replace('nan', '')
-    
-    # Nettoyage vectorisé des noms
-    cleaned_df[product_name_col] = (cleaned_df[product_name_col]
-                                   .str.strip()
-                                   .str.replace(r'\s+', ' ', regex=True)
-                                   .str.replace(r'[\x00-\x1f\x7f-\x9f]', '', regex=True))
-    
-    names_changed = (original_names.astype(str) != cleaned_df[product_name_col]).sum()
+    # === NETTOYAGE DES NOMS ET DES RÉFÉRENCES ===
+    if product_name_col == product_ref_col:
+        # Même colonne (cas par défaut d'un fichier à une seule colonne) : les références
+        # sont nettoyées à partir des noms déjà nettoyés, comme deux étapes successives
+        cleaned_df[product_name_col], names_changed = _clean_names(df[product_name_col])
+        cleaned_df[product_ref_col], refs_changed = _clean_refs(cleaned_df[product_name_col])
+    else:
+        # Les deux colonnes sont indépendantes : nettoyées dans deux threads. Seuls les noyaux
+        # pyarrow.compute libèrent le GIL ; le chevauchement n'a lieu que si la colonne des noms
+        # est stockée en Arrow (le nettoyage par re garde le GIL)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            names_future = executor.submit(_clean_names, df[product_name_col])
+            refs_future = executor.submit(_clean_refs, df[product_ref_col])
+            cleaned_df[product_name_col], names_changed = names_future.result()
+            cleaned_df[product_ref_col], refs_changed = refs_future.result()
     
-    # === NETTOYAGE DES RÉFÉRENCES ===
-    original_refs = cleaned_df[product_ref_col].copy()
+    # === IDENTIFICATION DES DOUBLONS ===
+    # Chaque colonne clé est factorisée une seule fois en codes entiers : la détection des doublons
+    # et le comptage des occurrences hachent ensuite des entiers au lieu des chaînes
+    name_codes, name_uniques = pd.factorize(cleaned_df[product_name_col])
+    ref_codes, ref_uniques = pd.factorize(cleaned_df[product_ref_col])
+    pair_codes = pd.Series(name_codes.astype('int64') * len(ref_uniques) + ref_codes)
     
-    # Convertir en string et gérer les NaN
-    cleaned_df[product_ref_col] = cleaned_df[product_ref_col].astype(str)
-    cleaned_df[product_ref_col] = cleaned_df[product_ref_col].replace('nan', '')
+    duplicate_mask = pair_codes.duplicated(keep=False).to_numpy()
     
-    # Nettoyage de base
-    cleaned_df[product_ref_col] = (cleaned_df[product_ref_col]
-                                  .str.strip()
-                                  .str.replace(r'[\x00-\x1f\x7f-\x9f]', '', regex=True))
+    # Diviser les DataFrames
+    # Pas de .copy() : l'indexation booléenne renvoie déjà de nouveaux DataFrames,
+    # qui ne sont ensuite qu'affichés et exportés
+    unique_df = cleaned_df.loc[~duplicate_mask]
+    duplicate_df = cleaned_df.loc[duplicate_mask]
     
-    # Correction intelligente o->0
-    mask_has_digits = cleaned_df[product_ref_col].str.contains(r'\d', na=False)
-    cleaned_df.loc[mask_has_digits, product_ref_col] = (
-        cleaned_df.loc[mask_has_digits, product_ref_col]
-        .str.replace(r'(?<=\d)[oO](?=\d)', '0', regex=True)
-        .str.replace(r'^[oO](?=\d)', '0', regex=True)
-        .str.replace(r'(?<=\d)[oO]$', '0', regex=True)
+    # Occurrences par combinaison dupliquée, calculées une seule fois (réutilisées par l'interface)
+    pair_counts = pair_codes[duplicate_mask].value_counts()
+    pair_index = pair_counts.index.to_numpy()
+    duplicate_counts = pd.Series(
+        pair_counts.to_numpy(),
+        index=pd.MultiIndex.from_arrays(
+            [name_uniques.take(pair_index // len(ref_uniques)),
+             ref_uniques.take(pair_index % len(ref_uniques))],
+            names=[product_name_col, product_ref_col]
+        ),
+        name='Occurrences'
     )
     
-    refs_changed = (original_refs.astype(str) != cleaned_df[product_ref_col]).sum()
-    
-    # === IDENTIFICATION DES DOUBLONS ===
-    cleaned_df['_temp_key'] = (cleaned_df[product_name_col] + '|' + 
-                              cleaned_df[product_ref_col])
+    # === STATISTIQUES ===
+    # Vérification des valeurs vides (après nettoyage, NaN et 'nan' sont déjà devenus '')
+    empty_names_unique = (unique_df[product_name_col] == '').sum()
+    empty_refs_unique = (unique_df[product_ref_col] == '').sum()
     
-    duplicate_mask = cleaned_df['_temp_key'].duplicated(keep=False)
+    stats = {
+        'names_changed': int(names_changed),
+        'refs_changed': int(refs_changed),
+        'empty_names': int(empty_names_unique),
+        'empty_refs': int(empty_refs_unique),
+        'duplicate_groups': len(duplicate_counts),
+        'top_duplicates': [(name, ref, int(count))
+                           for (name, ref), count in duplicate_counts.head(5).items()],
+    }
     
-    # Diviser les DataFrames
-    unique_df = cleaned_df[~duplicate_mask].drop('_temp_key', axis=1).copy()
-    duplicate_df = cleaned_df[duplicate_mask].drop('_temp_key', axis=1).copy()
-    
-    # === AVERTISSEMENTS ===
-    if names_changed > 0:
-        warnings.append(f"✏️ {names_changed} noms de produits ont été nettoyés")
-    if refs_changed > 0:
-        warnings.append(f"🔧 {refs_changed} références ont été corrigées")
-    
-    # Vérification des valeurs vides
-    empty_names_unique = (unique_df[product_name_col].isin(['', 'nan']) | 
-                         unique_df[product_name_col].isna()).sum()
-    empty_refs_unique = (unique_df[product_ref_col].isin(['', 'nan']) | 
-                        unique_df[product_ref_col].isna()).sum()
+    return unique_df, duplicate_df, duplicate_counts, stats
+
+
+def format_cleaning_warnings(stats: Dict[str, Any]) -> List[str]:
+    """Met en forme les statistiques de nettoyage en messages pour l'interface"""
+    warnings = []
+    if stats['names_changed'] > 0:
+        warnings.append(f"✏️ {stats['names_changed']} noms de produits ont été nettoyés")
+    if stats['refs_changed'] > 0:
+        warnings.append(f"🔧 {stats['refs_changed']} références ont été corrigées")
     
-    if empty_names_unique > 0:
-        warnings.append(f"⚠️ {empty_names_unique} noms vides dans les données uniques")
-    if empty_refs_unique > 0:
-        warnings.append(f"⚠️ {empty_refs_unique} références vides dans les données uniques")
+    if stats['empty_names'] > 0:
+        warnings.append(f"⚠️ {stats['empty_names']} noms vides dans les données uniques")
+    if stats['empty_refs'] > 0:
+        warnings.append(f"⚠️ {stats['empty_refs']} références vides dans les données uniques")
     
-    if len(duplicate_df) > 0:
-        duplicate_groups = duplicate_df.groupby([product_name_col, product_ref_col]).size()
-        top_duplicates = duplicate_groups.sort_values(ascending=False).head(5)
-        
-        warnings.append(f"🔄 {len(duplicate_groups)} groupes de doublons trouvés")
+    if stats['duplicate_groups'] > 0:
+        warnings.append(f"🔄 {stats['duplicate_groups']} groupes de doublons trouvés")
         warnings.append("Top 5 doublons:")
-        for (name, ref), count in top_duplicates.items():
+        for name, ref, count in stats['top_duplicates']:
             warnings.append(f"  • '{name}' | '{ref}' : {count} occurrences")
     
-    return unique_df, duplicate_df, warnings
+    return warnings
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def read_uploaded_file(file_name: str, file_bytes: bytes) -> pd.DataFrame:
+    """
+    Lit un fichier Excel/CSV à partir de son contenu brut.
+    Lecteur CSV pyarrow multithread (colonnes stockées en Arrow), lecteur Excel calamine.
+    Mis en cache sur le contenu du fichier : il n'est pas relu à chaque interaction.
+    """
+    buffer = BytesIO(file_bytes)
+    if file_name.endswith('.csv'):
+        try:
+            df = pd.read_csv(buffer, engine='pyarrow', dtype_backend='pyarrow')
+        except ValueError:
+            df = None
+        if df is None or df.columns.has_duplicates:
+            # En-têtes répétés (refusés ou conservés tels quels selon la version) : le moteur C
+            # les renomme (a, a.1) comme avant
+            df = pd.read_csv(BytesIO(file_bytes), dtype_backend='pyarrow')
+        return df
+    # Pas de dtype_backend='pyarrow' : une colonne Excel à types mixtes (1234 puis 'AB12')
+    # ne se convertit pas en type Arrow et reste en object
+    return pd.read_excel(buffer, engine='calamine')
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def _clean_cached(file_name: str,
+                  file_bytes: bytes,
+                  product_name_col: str,
+                  product_ref_col: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, Dict[str, Any]]:
+    """
+    Version mise en cache de clean_inventory_data, indexée sur le contenu du fichier
+    et les colonnes choisies : un même fichier n'est nettoyé qu'une seule fois.
+    """
+    df = read_uploaded_file(file_name, file_bytes)
+    return clean_inventory_data(df, product_name_col, product_ref_col)
 
 
 def to_excel(df):
     """Convertit un DataFrame en fichier Excel téléchargeable"""
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+    # Pas de constant_memory : pandas écrit colonne par colonne, ce mode perdrait les lignes déjà passées
+    with pd.ExcelWriter(output, engine='xlsxwriter',
+                        engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
         df.to_excel(writer, sheet_name='Données', index=False)
     processed_data = output.getvalue()
     return processed_data
 
 
+def to_parquet(df):
+    """Convertit un DataFrame en fichier Parquet téléchargeable (bien plus rapide que l'Excel)"""
+    try:
+        return df.to_parquet(index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Colonnes object à types mixtes (ex. nombres et texte) : exportées en texte
+        object_cols = df.select_dtypes(include='object').columns
+        return df.astype({col: str for col in object_cols}).to_parquet(index=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def _to_excel_cached(file_name: str,
+                     file_bytes: bytes,
+                     product_name_col: str,
+                     product_ref_col: str,
+                     part: str) -> bytes:
+    """
+    Export Excel mis en cache des données uniques (part='unique') ou dupliquées (part='duplicate').
+    Indexé sur le fichier et les colonnes, et non sur le DataFrame : Streamlit ne hache
+    qu'un échantillon des grands DataFrames et pourrait renvoyer un ancien export.
+    """
+    unique_df, duplicate_df, _, _ = _clean_cached(file_name, file_bytes, product_name_col, product_ref_col)
+    return to_excel(unique_df if part == 'unique' else duplicate_df)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def _to_parquet_cached(file_name: str,
+                       file_bytes: bytes,
+                       product_name_col: str,
+                       product_ref_col: str,
+                       part: str) -> bytes:
+    """Export Parquet mis en cache, indexé comme _to_excel_cached"""
+    unique_df, duplicate_df, _, _ = _clean_cached(file_name, file_bytes, product_name_col, product_ref_col)
+    return to_parquet(unique_df if part == 'unique' else duplicate_df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
 def create_statistics_chart(unique_count, duplicate_count):
     """Crée un graphique des statistiques"""
     fig = go.Figure(data=[
@@ -134,6 +317,25 @@ def create_statistics_chart(unique_count, duplicate_count):
     return fig
 
 
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def create_duplicates_chart(top_duplicates: pd.DataFrame, name_col: str, ref_col: str):
+    """Crée le graphique des combinaisons les plus dupliquées"""
+    top_duplicates = top_duplicates.copy()
+    top_duplicates['Label'] = top_duplicates[name_col] + " | " + top_duplicates[ref_col]
+    
+    fig = px.bar(
+        top_duplicates, 
+        x='Occurrences', 
+        y='Label',
+        orientation='h',
+        title="Top 10 des Combinaisons Dupliquées",
+        color='Occurrences',
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
 def main():
     # Titre et description
     st.title("📊 Nettoyage et Division d'Inventaire")
@@ -156,10 +358,8 @@ def main():
         if uploaded_file is not None:
             # Lecture du fichier
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                else:
-                    df = pd.read_excel(uploaded_file)
+                file_bytes = uploaded_file.getvalue()
+                df = read_uploaded_file(uploaded_file.name, file_bytes)
                 
                 st.success(f"✅ Fichier chargé: {len(df)} lignes")
                 
@@ -209,7 +409,9 @@ def main():
             try:
                 with st.spinner("Traitement en cours..."):
                     # Appliquer le nettoyage
-                    unique_df, duplicate_df, warnings = clean_inventory_data(df, name_col, ref_col)
+                    unique_df, duplicate_df, duplicate_counts, stats = _clean_cached(
+                        uploaded_file.name, file_bytes, name_col, ref_col
+                    )
                 
                 # Métriques
                 col1, col2, col3, col4 = st.columns(4)
@@ -233,6 +435,7 @@ def main():
                     st.plotly_chart(fig, use_container_width=True)
                 
                 # Avertissements
+                warnings = format_cleaning_warnings(stats)
                 if warnings:
                     with st.expander("⚠️ Détails du nettoyage", expanded=True):
                         for warning in warnings:
@@ -247,13 +450,23 @@ def main():
                         st.dataframe(unique_df, use_container_width=True)
                         
                         # Téléchargement Excel
-                        excel_unique = to_excel(unique_df)
+                        excel_unique = _to_excel_cached(uploaded_file.name, file_bytes,
+                                                        name_col, ref_col, 'unique')
                         st.download_button(
                             label="📥 Télécharger Données Uniques (Excel)",
                             data=excel_unique,
                             file_name="unique_PDR_carton.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                         )
+                        
+                        # Téléchargement Parquet
+                        st.download_button(
+                            label="📥 Télécharger Données Uniques (Parquet)",
+                            data=_to_parquet_cached(uploaded_file.name, file_bytes,
+                                                    name_col, ref_col, 'unique'),
+                            file_name="unique_PDR_carton.parquet",
+                            mime="application/octet-stream"
+                        )
                     else:
                         st.info("Aucune donnée unique trouvée")
                 
@@ -263,44 +476,43 @@ def main():
                         st.dataframe(duplicate_df, use_container_width=True)
                         
                         # Téléchargement Excel
-                        excel_duplicate = to_excel(duplicate_df)
+                        excel_duplicate = _to_excel_cached(uploaded_file.name, file_bytes,
+                                                           name_col, ref_col, 'duplicate')
                         st.download_button(
                             label="📥 Télécharger Données Dupliquées (Excel)",
                             data=excel_duplicate,
                             file_name="duplicate_PDR_carton.xlsx",
                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                         )
+                        
+                        # Téléchargement Parquet
+                        st.download_button(
+                            label="📥 Télécharger Données Dupliquées (Parquet)",
+                            data=_to_parquet_cached(uploaded_file.name, file_bytes,
+                                                    name_col, ref_col, 'duplicate'),
+                            file_name="duplicate_PDR_carton.parquet",
+                            mime="application/octet-stream"
+                        )
                     else:
                         st.success("🎉 Aucun doublon trouvé!")
                 
                 # Analyse détaillée des doublons
                 if len(duplicate_df) > 0:
                     with st.expander("🔍 Analyse détaillée des doublons", expanded=False):
-                        # Grouper par combinaison nom/référence
-                        duplicate_analysis = duplicate_df.groupby([name_col, ref_col]).agg({
-                            duplicate_df.columns[0]: 'count'  # Utiliser la première colonne pour compter
-                        }).rename(columns={duplicate_df.columns[0]: 'Occurrences'})
-                        
-                        duplicate_analysis = duplicate_analysis.reset_index()
-                        duplicate_analysis = duplicate_analysis.sort_values('Occurrences', ascending=False)
+                        # Occurrences par combinaison nom/référence (déjà triées par ordre décroissant)
+                        # (une seule colonne de clé si nom et référence sont la même colonne)
+                        if name_col == ref_col:
+                            duplicate_analysis = duplicate_counts.droplevel(1).reset_index()
+                        else:
+                            duplicate_analysis = duplicate_counts.reset_index()
                         
                         st.dataframe(duplicate_analysis, use_container_width=True)
                         
                         # Graphique des top doublons
                         if len(duplicate_analysis) > 0:
-                            top_10 = duplicate_analysis.head(10)
-                            top_10['Label'] = top_10[name_col] + " | " + top_10[ref_col]
-                            
-                            fig_duplicates = px.bar(
-                                top_10, 
-                                x='Occurrences', 
-                                y='Label',
-                                orientation='h',
-                                title="Top 10 des Combinaisons Dupliquées",
-                                color='Occurrences',
-                                color_continuous_scale='Reds'
+                            fig_duplicates = create_duplicates_chart(
+                                duplicate_analysis.head(10), name_col, ref_col
                             )
-                            fig_duplicates.update_layout(height=400)
                             st.plotly_chart(fig_duplicates, use_container_width=True)
                 
             except Exception as e:
@@ -314,14 +526,14 @@ def main():
         1. **📁 Chargez votre fichier** Excel ou CSV dans la barre latérale
         2. **🏷️ Sélectionnez les colonnes** contenant le nom et la référence du produit  
         3. **🚀 Cliquez sur "Nettoyer et Diviser"** pour traiter vos données
-        4. **📥 Téléchargez les résultats** en Excel (données uniques et doublons séparés)
+        4. **📥 Téléchargez les résultats** en Excel ou Parquet (données uniques et doublons séparés)
         
         ### ✨ Fonctionnalités:
         - 🧹 **Nettoyage automatique** des espaces et caractères indésirables
         - 🔧 **Correction intelligente** des erreurs courantes (o → 0)
         - 📊 **Visualisation** des statistiques et doublons
         - 📈 **Analyse détaillée** des combinaisons problématiques
-        - 💾 **Export Excel** des résultats séparés
+        - 💾 **Export Excel et Parquet** des résultats séparés
         """)
         
         # Exemple de données
@@ -0,0 +1,60 @@
+from io import BytesIO
+
+import pandas as pd
+
+import comb
+
+
+def test_to_excel_round_trip():
+    df = pd.DataFrame({
+        'designation': ['Produit A', 'Produit B', 'Produit C'],
+        'reference': ['REF001', 'REF002', 'REF003'],
+        'quantite': [10, 20, 30],
+    })
+    result = pd.read_excel(BytesIO(comb.to_excel(df)), engine='calamine')
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+
+def test_to_parquet_round_trip():
+    df = pd.DataFrame({
+        'designation': ['Produit A', 'Produit B'],
+        'reference': ['REF001', 'REF002'],
+        'quantite': [10, 20],
+    })
+    result = pd.read_parquet(BytesIO(comb.to_parquet(df)))
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+
+def test_csv_and_excel_uploads_split_the_same_way():
+    # 'emplacement' commence par des nombres puis contient du texte
+    df = pd.DataFrame({'designation': ['A', 'A', 'B'], 'reference': ['001', '1', '2'],
+                       'emplacement': ['1234', 'AB12', '2.5']})
+    csv_bytes = df.to_csv(index=False).encode()
+    excel_bytes = BytesIO()
+    pd.DataFrame({'designation': ['A', 'A', 'B'], 'reference': [1, 1, 2],
+                  'emplacement': pd.Series([1234, 'AB12', 2.5], dtype=object)}).to_excel(
+        excel_bytes, index=False, engine='xlsxwriter'
+    )
+
+    csv_result = comb._clean_cached('inventaire.csv', csv_bytes, 'designation', 'reference')
+    excel_result = comb._clean_cached('inventaire.xlsx', excel_bytes.getvalue(), 'designation', 'reference')
+
+    assert len(csv_result[1]) == len(excel_result[1]) == 2
+    assert csv_result[3]['top_duplicates'] == excel_result[3]['top_duplicates'] == [('A', '1', 2)]
+
+
+def test_csv_with_repeated_header_is_renamed():
+    csv_bytes = b'designation,designation\nA,B\n'
+    df = comb.read_uploaded_file('inventaire.csv', csv_bytes)
+    assert df.columns.tolist() == ['designation', 'designation.1']
+
+
+def test_same_column_for_name_and_reference():
+    df = pd.DataFrame({'designation': ['a  b', 'a\tb', 'x']})
+    unique_df, duplicate_df, duplicate_counts, stats = comb.clean_inventory_data(
+        df, 'designation', 'designation'
+    )
+    assert duplicate_df['designation'].tolist() == ['a b', 'a b']
+    assert unique_df['designation'].tolist() == ['x']
+    assert stats['names_changed'] == 2
+    assert stats['top_duplicates'] == [('a b', 'a b', 2)]